@@ -3,6 +3,8 @@ Math Agent module for solving mathematical expressions using LangChain.
 """
 
 import time
+from typing import Final
+
 from langchain.schema import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
@@ -12,6 +14,9 @@ from app.enums import ErrorMessage
 
 logger = get_logger(__name__)
 
+# The system prompt is static, so its message is built once and shared
+_MATH_SYSTEM_MESSAGE: Final = SystemMessage(content=MATH_AGENT_SYSTEM_PROMPT)
+
 
 async def solve_math(query: str, llm: ChatOpenAI) -> str:
     """
@@ -33,7 +38,7 @@ async def solve_math(query: str, llm: ChatOpenAI) -> str:
 
     # Create messages
     messages = [
-        SystemMessage(content=MATH_AGENT_SYSTEM_PROMPT),
+        _MATH_SYSTEM_MESSAGE,
         HumanMessage(content=f"Evaluate this mathematical expression: {query}"),
     ]
 
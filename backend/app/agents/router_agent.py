@@ -5,19 +5,178 @@ This module provides a function to route user queries to the appropriate agent
 based on the query content using an LLM classifier.
 """
 
+import ast
+import asyncio
+import re
 import time
+import unicodedata
+from collections import OrderedDict
+from typing import Final
 
+import ahocorasick
 from langchain_openai import ChatOpenAI
 from langchain.schema import HumanMessage, SystemMessage
 
 from app.security.prompts import ROUTER_SYSTEM_PROMPT, ROUTER_CONVERSION_PROMPT
 from app.enums import ResponseEnum
+from app.core.settings import get_settings
 from app.core.logging import get_logger, log_agent_decision
 
 logger = get_logger(__name__)
 
+# Suspicious patterns, built once at import and shared across calls
+_SUSPICIOUS_PATTERNS: Final[tuple[str, ...]] = (
+    "ignore previous instructions",
+    "forget everything",
+    "system prompt",
+    "you are now",
+    "act as",
+    "pretend to be",
+    "roleplay",
+    "jailbreak",
+    "developer mode",
+    "admin mode",
+    "override",
+    "bypass",
+    "exploit",
+    "hack",
+    "inject",
+    "execute",
+    "run command",
+    "system call",
+    "eval(",
+    "exec(",
+    "import os",
+    "subprocess",
+    "shell",
+    "terminal",
+    "command line",
+    "prompt injection",
+    "llm injection",
+    # Portuguese patterns
+    "ignore as instruções anteriores",
+    "esqueça tudo",
+    "prompt do sistema",
+    "você agora é",
+    "aja como",
+    "finja ser",
+    "interprete o papel de",
+)
+
+
+def _fold_text(text: str) -> str:
+    """Lowercase text and strip accents so accented and plain spellings match."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _build_suspicious_automaton() -> ahocorasick.Automaton:
+    """
+    Build an Aho-Corasick automaton over the folded suspicious patterns.
 
-def _validate_response(response: str) -> str:
+    Each entry stores the original pattern and whether folding changed it.
+    Folded patterns must end on a word boundary, since stripping accents can
+    turn a whole word into a prefix of another (e.g. "é" into "e" of "está").
+    """
+    automaton = ahocorasick.Automaton()
+    for pattern in _SUSPICIOUS_PATTERNS:
+        folded = _fold_text(pattern)
+        automaton.add_word(folded, (pattern, folded != pattern))
+    automaton.make_automaton()
+    return automaton
+
+
+# All literal patterns matched in a single pass over the query
+_SUSPICIOUS_AUTOMATON: Final = _build_suspicious_automaton()
+
+# URL schemes and script injection, checked in one regex pass. Patterns are
+# lowercase ASCII and matched against the already folded query.
+_URL_SCRIPT_RE: Final = re.compile(r"https?://|file://|javascript:|data:|<script")
+
+# Queries shorter than every pattern cannot match
+_SUSPICIOUS_MIN_LENGTH: Final[int] = min(
+    len(_fold_text(pattern)) for pattern in _SUSPICIOUS_PATTERNS
+)
+
+# Queries made only of numbers and arithmetic operators, with at least one of
+# each, are routed to MathAgent without asking the LLM. A hyphen only counts as
+# an operator when it is not squeezed between two digits, so dates, phone
+# numbers and IDs such as "2024-01-15" or "555-1234" still go to the LLM.
+_ARITHMETIC_ONLY_RE: Final = re.compile(
+    r"(?=.*\d)(?=.*(?:[+*/^%√]|(?<!\d)-|-(?!\d)))[\d\s+\-*/^%√().,=]+"
+)
+
+# Operator spellings mapped to Python syntax so an expression can be parsed
+_ARITHMETIC_TRANSLATION: Final = str.maketrans({"^": "**", "√": "+"})
+
+# Syntax nodes allowed in an expression that takes the arithmetic shortcut
+_ARITHMETIC_NODES: Final = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Constant,
+    ast.operator,
+    ast.unaryop,
+)
+
+# Math agent results that need no conversational rewording
+_PLAIN_NUMBER_RE: Final = re.compile(r"-?\d+(?:\.\d+)?")
+
+# Labels exactly as the router prompt asks the LLM to spell them
+_CANONICAL_RESPONSES: Final[dict[str, ResponseEnum]] = {
+    decision.value: decision for decision in ResponseEnum
+}
+
+# Mapping of normalized keywords to canonical agent names
+_RESPONSE_MAP: Final[dict[str, ResponseEnum]] = {
+    "mathagent": ResponseEnum.MathAgent,
+    "knowledgeagent": ResponseEnum.KnowledgeAgent,
+    "unsupportedlanguage": ResponseEnum.UnsupportedLanguage,
+    "error": ResponseEnum.Error,
+}
+
+# System prompts are static, so their messages are built once and shared
+_ROUTER_SYSTEM_MESSAGE: Final = SystemMessage(content=ROUTER_SYSTEM_PROMPT)
+_CONVERSION_SYSTEM_MESSAGE: Final = SystemMessage(content=ROUTER_CONVERSION_PROMPT)
+
+# Recent routing decisions keyed on the normalized query, oldest first
+_ROUTE_CACHE_MAX_SIZE: Final[int] = 4096
+_route_cache: OrderedDict[str, ResponseEnum] = OrderedDict()
+
+# Routing LLM calls currently running, keyed like the cache
+_inflight_routes: dict[str, asyncio.Task[ResponseEnum]] = {}
+
+
+def _normalize_query(query: str) -> str:
+    """Normalize a query into a routing cache key (lowercase, collapsed spaces)."""
+    return " ".join(query.lower().split())
+
+
+def _get_cached_route(key: str) -> ResponseEnum | None:
+    """Return the cached decision for a key, marking it as recently used."""
+    decision = _route_cache.get(key)
+    if decision is not None:
+        _route_cache.move_to_end(key)
+    return decision
+
+
+def _cache_route(key: str, decision: ResponseEnum) -> None:
+    """Store a decision, evicting the least recently used one when full."""
+    _route_cache[key] = decision
+    _route_cache.move_to_end(key)
+    if len(_route_cache) > _ROUTE_CACHE_MAX_SIZE:
+        _route_cache.popitem(last=False)
+
+
+def reset_route_cache() -> None:
+    """Clear all cached routing decisions."""
+    _route_cache.clear()
+
+
+def _validate_response(response: str) -> ResponseEnum:
     """
     Validate and clean the LLM response.
 
@@ -25,20 +184,22 @@ def _validate_response(response: str) -> str:
         response: Raw response from the LLM
 
     Returns:
-        Cleaned response ("MathAgent", "KnowledgeAgent", "UnsupportedLanguage", or "Error")
+        ResponseEnum: The canonical decision (MathAgent, KnowledgeAgent,
+        UnsupportedLanguage, or Error)
     """
-    # Clean the response
-    cleaned_response = response.strip().lower()
-
-    # Mapping of keywords to canonical agent names
-    response_map = {
-        "mathagent": ResponseEnum.MathAgent,
-        "knowledgeagent": ResponseEnum.KnowledgeAgent,
-        "unsupportedlanguage": ResponseEnum.UnsupportedLanguage,
-        "error": ResponseEnum.Error,
-    }
-
-    for key, value in response_map.items():
+    # Fast path: the LLM usually answers with a bare, correctly cased label
+    cleaned_response = response.strip()
+    decision = _CANONICAL_RESPONSES.get(cleaned_response)
+    if decision is not None:
+        return decision
+
+    cleaned_response = cleaned_response.lower()
+    decision = _RESPONSE_MAP.get(cleaned_response)
+    if decision is not None:
+        return decision
+
+    # Fall back to a substring scan for labels wrapped in extra text
+    for key, value in _RESPONSE_MAP.items():
         if key in cleaned_response:
             return value
 
@@ -49,6 +210,44 @@ def _validate_response(response: str) -> str:
     return ResponseEnum.Error
 
 
+def _is_plain_arithmetic(query: str) -> bool:
+    """
+    Check whether a query is nothing but a parseable arithmetic expression.
+
+    Args:
+        query: Stripped user query, optionally ending with "="
+
+    Returns:
+        True if the query is plain arithmetic, False otherwise
+    """
+    expression = query.removesuffix("=").strip()
+    if not _ARITHMETIC_ONLY_RE.fullmatch(expression):
+        return False
+
+    # Phone numbers, CNPJs and dates fit the character set but do not parse,
+    # e.g. because of leading zeros or numbers placed side by side
+    try:
+        tree = ast.parse(expression.translate(_ARITHMETIC_TRANSLATION), mode="eval")
+    except SyntaxError:
+        return False
+    return all(isinstance(node, _ARITHMETIC_NODES) for node in ast.walk(tree))
+
+
+def _find_suspicious_pattern(query: str) -> str | None:
+    """Return the first suspicious pattern found in the query, if any."""
+    query_folded = _fold_text(query)
+    if len(query_folded) < _SUSPICIOUS_MIN_LENGTH:
+        return None
+
+    for end, (pattern, whole_word) in _SUSPICIOUS_AUTOMATON.iter(query_folded):
+        if whole_word and query_folded[end + 1 : end + 2].isalnum():
+            continue
+        return pattern
+
+    match = _URL_SCRIPT_RE.search(query_folded)
+    return match.group(0) if match else None
+
+
 def _detect_suspicious_content(query: str) -> bool:
     """
     Detect potentially suspicious or malicious content in the query.
@@ -59,62 +258,16 @@ def _detect_suspicious_content(query: str) -> bool:
     Returns:
         True if suspicious content is detected, False otherwise
     """
-    suspicious_patterns = [
-        "ignore previous instructions",
-        "forget everything",
-        "system prompt",
-        "you are now",
-        "act as",
-        "pretend to be",
-        "roleplay",
-        "jailbreak",
-        "developer mode",
-        "admin mode",
-        "override",
-        "bypass",
-        "exploit",
-        "hack",
-        "inject",
-        "execute",
-        "run command",
-        "system call",
-        "file://",
-        "http://",
-        "https://",
-        "<script>",
-        "javascript:",
-        "data:",
-        "eval(",
-        "exec(",
-        "import os",
-        "subprocess",
-        "shell",
-        "terminal",
-        "command line",
-        "prompt injection",
-        "llm injection",
-        # Portuguese patterns
-        "ignore as instruções anteriores",
-        "esqueça tudo",
-        "prompt do sistema",
-        "você agora é",
-        "aja como",
-        "finja ser",
-        "interprete o papel de",
-    ]
-
-    query_lower = query.lower()
-
-    for pattern in suspicious_patterns:
-        if pattern in query_lower:
-            logger.warning(
-                "Suspicious content detected in query",
-                pattern=pattern,
-                query_preview=query[:50],
-            )
-            return True
+    pattern = _find_suspicious_pattern(query)
+    if pattern is None:
+        return False
 
-    return False
+    logger.warning(
+        "Suspicious content detected in query",
+        pattern=pattern,
+        query_preview=query[:50],
+    )
+    return True
 
 
 async def route_query(
@@ -122,7 +275,7 @@ async def route_query(
     llm: ChatOpenAI,
     conversation_id: str | None = None,
     user_id: str | None = None,
-) -> str:
+) -> ResponseEnum:
     """
     Route a user query to the appropriate agent or return error status.
 
@@ -131,16 +284,15 @@ async def route_query(
         llm: ChatOpenAI LLM instance to use for routing
 
     Returns:
-        str: Either "MathAgent", "KnowledgeAgent", "UnsupportedLanguage", or "Error"
+        ResponseEnum: Either MathAgent, KnowledgeAgent, UnsupportedLanguage, or Error
 
     Raises:
         ValueError: If the query is empty or if there's an error processing the query
     """
-    if not query or not query.strip():
-        raise ValueError("Query cannot be empty")
-
     # Clean the query
-    cleaned_query = query.strip()
+    cleaned_query = query.strip() if query else ""
+    if not cleaned_query:
+        raise ValueError("Query cannot be empty")
 
     # Check for suspicious content
     if _detect_suspicious_content(cleaned_query):
@@ -152,6 +304,66 @@ async def route_query(
         )
         return ResponseEnum.KnowledgeAgent
 
+    # Plain arithmetic needs no classification
+    if _is_plain_arithmetic(cleaned_query):
+        logger.info(
+            "Arithmetic-only query routed to MathAgent without LLM",
+            conversation_id=conversation_id,
+            user_id=user_id,
+            query_preview=cleaned_query[:100],
+        )
+        return ResponseEnum.MathAgent
+
+    cache_key = _normalize_query(cleaned_query)
+    cached_decision = _get_cached_route(cache_key)
+    if cached_decision is not None:
+        logger.info(
+            "Routing decision served from cache",
+            conversation_id=conversation_id,
+            user_id=user_id,
+            decision=str(cached_decision),
+            query_preview=cleaned_query[:100],
+        )
+        return cached_decision
+
+    # Join an identical in-flight request instead of calling the LLM again
+    task = _inflight_routes.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(
+            _classify_query(cleaned_query, cache_key, llm, conversation_id, user_id)
+        )
+        _inflight_routes[cache_key] = task
+        task.add_done_callback(lambda _: _inflight_routes.pop(cache_key, None))
+    else:
+        logger.info(
+            "Joining in-flight routing request",
+            conversation_id=conversation_id,
+            user_id=user_id,
+            query_preview=cleaned_query[:100],
+        )
+
+    # Shield the shared task so one cancelled caller does not cancel the others
+    return await asyncio.shield(task)
+
+
+async def _classify_query(
+    cleaned_query: str,
+    cache_key: str,
+    llm: ChatOpenAI,
+    conversation_id: str | None,
+    user_id: str | None,
+) -> ResponseEnum:
+    """
+    Classify a cleaned query with the router LLM and cache the decision.
+
+    Args:
+        cleaned_query: The stripped user query
+        cache_key: Normalized form of the query used as the cache key
+        llm: ChatOpenAI LLM instance to use for routing
+
+    Returns:
+        ResponseEnum: The validated routing decision, or Error on failure
+    """
     start_time = time.time()
     try:
         logger.info(
@@ -163,7 +375,7 @@ async def route_query(
 
         # Create messages
         messages = [
-            SystemMessage(content=ROUTER_SYSTEM_PROMPT),
+            _ROUTER_SYSTEM_MESSAGE,
             HumanMessage(content=f'Query: "{cleaned_query}"'),
         ]
 
@@ -188,8 +400,11 @@ async def route_query(
             query_preview=cleaned_query[:100],
         )
 
-        # Validate and return the cleaned response
-        return _validate_response(response_text)
+        # Validate the response and remember successful decisions
+        decision = _validate_response(response_text)
+        if decision is not ResponseEnum.Error:
+            _cache_route(cache_key, decision)
+        return decision
 
     except Exception as e:
         execution_time = time.time() - start_time
@@ -235,10 +450,24 @@ async def convert_response(
         query_preview=original_query[:100],
     )
 
+    # Bare numbers answering bare arithmetic read the same in any language.
+    # A trailing "=" is dropped so it is not repeated in the template.
+    expression = original_query.strip().removesuffix("=").rstrip()
+    if (
+        agent_type == ResponseEnum.MathAgent
+        and get_settings().ROUTER_SKIP_ARITHMETIC_CONVERSION
+        and _PLAIN_NUMBER_RE.fullmatch(agent_response)
+        and _is_plain_arithmetic(expression)
+    ):
+        logger.info(
+            "Response conversion skipped for arithmetic query", agent_type=agent_type
+        )
+        return f"{expression} = {agent_response}"
+
     try:
         # Create messages for conversion
         messages = [
-            SystemMessage(content=ROUTER_CONVERSION_PROMPT),
+            _CONVERSION_SYSTEM_MESSAGE,
             HumanMessage(
                 content=f"""Original Query: "{original_query}"
 Agent Type: {agent_type}
@@ -197,7 +197,7 @@ async def chat(
     agent_workflow.append(step)
 
     try:
-        if decision in [ResponseEnum.MathAgent]:
+        if decision is ResponseEnum.MathAgent:
             final_response = await convert_response(
                 original_query=sanitized_message,
                 agent_response=source_agent_response,
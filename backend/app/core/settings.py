@@ -40,6 +40,11 @@ class Settings(BaseSettings):
         "Chrome/91.0.4472.124 Safari/537.36"
     )
 
+    # Router configuration
+    # Answer plain arithmetic queries with "<query> = <result>" instead of
+    # asking the LLM to phrase the math result conversationally
+    ROUTER_SKIP_ARITHMETIC_CONVERSION: bool = False
+
     # Redis configuration
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -39,6 +39,7 @@ def main():
             "router",
             "math",
             "chat",
+            "smoke",
             "coverage",
             "coverage-html",
             "coverage-report",
@@ -50,6 +51,12 @@ def main():
         "--verbose", "-v", action="store_true", help="Run tests in verbose mode"
     )
     parser.add_argument("--no-warnings", action="store_true", help="Suppress warnings")
+    parser.add_argument(
+        "--parallel",
+        "-n",
+        metavar="WORKERS",
+        help="Distribute tests across workers with pytest-xdist (e.g. 'auto' or 4)",
+    )
     parser.add_argument(
         "--coverage-threshold",
         type=int,
@@ -73,6 +80,9 @@ def main():
     if args.no_warnings:
         base_cmd.extend(["--disable-warnings"])
 
+    if args.parallel:
+        base_cmd.extend(["-n", args.parallel])
+
     # Coverage options
     coverage_args = ["--cov=app", "--cov-report=term"]
     if args.coverage_fail_under:
@@ -106,6 +116,10 @@ def main():
             "cmd": base_cmd + ["tests/api/v1/test_chat_api.py"],
             "description": "Chat API E2E Tests",
         },
+        "smoke": {
+            "cmd": base_cmd + ["-m", "smoke", "tests/api/v1/test_chat_api.py"],
+            "description": "Chat API Smoke Tests (main flows only)",
+        },
         "coverage": {
             "cmd": base_cmd
             + [
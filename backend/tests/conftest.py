@@ -6,12 +6,14 @@ without making external calls or warming up expensive resources.
 """
 
 import pytest
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 from langchain_openai import ChatOpenAI
 from llama_index.core.base.base_query_engine import BaseQueryEngine
 
 from app.main import app
+from app.agents.router_agent import reset_route_cache
 from app.dependencies import (
     get_math_llm,
     get_router_llm,
@@ -20,38 +22,97 @@ from app.dependencies import (
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_llm():
-    """Create a mock ChatOpenAI instance for testing."""
+    """Create a mock ChatOpenAI instance shared by the whole session."""
     mock = AsyncMock(spec=ChatOpenAI)
     return mock
 
 
 @pytest.fixture
+def make_llm_response():
+    """Create a factory for lightweight LLM responses exposing .content."""
+
+    def _make(content):
+        return SimpleNamespace(content=content)
+
+    return _make
+
+
+@pytest.fixture
+def set_llm_responses(mock_llm, make_llm_response):
+    """Create a helper that queues LLM replies in call order.
+
+    Exceptions are queued as-is so the matching call raises them.
+    """
+
+    def _set(*contents):
+        mock_llm.ainvoke.side_effect = [
+            content if isinstance(content, Exception) else make_llm_response(content)
+            for content in contents
+        ]
+
+    return _set
+
+
+@pytest.fixture(scope="session")
 def mock_knowledge_engine():
-    """Create a mock BaseQueryEngine instance for testing."""
+    """Create a mock BaseQueryEngine instance shared by the whole session."""
     mock = AsyncMock(spec=BaseQueryEngine)
     return mock
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_redis_service():
-    """Create a mock RedisService instance for testing."""
-    mock = Mock()
-    mock.add_message_to_history.return_value = True
-    mock.get_history.return_value = []
-    mock.get_user_conversations.return_value = []
-    return mock
+    """Create a mock RedisService instance shared by the whole session."""
+    return Mock()
 
 
-@pytest.fixture
-def test_client():
-    """Create a test client for the FastAPI application."""
-    return TestClient(app)
+def _override_dependencies(
+    monkeypatch, mock_llm, mock_knowledge_engine, mock_redis_service
+):
+    """
+    Point the app's dependency providers at the test mocks.
+
+    The overrides are set through monkeypatch, so undoing it restores only
+    these keys and leaves any other overrides alone.
+    """
+    overrides = app.dependency_overrides
+    monkeypatch.setitem(overrides, get_math_llm, lambda: mock_llm)
+    monkeypatch.setitem(overrides, get_router_llm, lambda: mock_llm)
+    monkeypatch.setitem(overrides, get_knowledge_engine, lambda: mock_knowledge_engine)
+    monkeypatch.setitem(overrides, get_redis_service, lambda: mock_redis_service)
+
+
+@pytest.fixture(scope="session")
+async def async_client(mock_llm, mock_knowledge_engine, mock_redis_service):
+    """Create an async client that calls the app in-process on the test loop."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # Send one full math request so one-time work (validator and
+        # serializer set-up, logging configuration) is not timed as part
+        # of whichever test happens to run first
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            _override_dependencies(
+                monkeypatch, mock_llm, mock_knowledge_engine, mock_redis_service
+            )
+            mock_llm.ainvoke.side_effect = [
+                SimpleNamespace(content=content) for content in ("MathAgent", "4", "4")
+            ]
+            await client.post(
+                "/api/v1/chat",
+                json={
+                    "message": "What is 2 + 2?",
+                    "user_id": "u",
+                    "conversation_id": "c",
+                },
+            )
+
+        yield client
 
 
 @pytest.fixture(autouse=True)
-def mock_dependencies(mock_llm, mock_knowledge_engine, mock_redis_service):
+def mock_dependencies(monkeypatch, mock_llm, mock_knowledge_engine, mock_redis_service):
     """
     Automatically mock all dependencies to prevent external calls.
 
@@ -60,17 +121,29 @@ def mock_dependencies(mock_llm, mock_knowledge_engine, mock_redis_service):
     - Knowledge engine is mocked
     - Redis service is mocked
     - No external API calls are made
+
+    The mocks are shared across the session, so their calls, return values
+    and side effects are reset before each test. The overrides go through
+    monkeypatch, which restores just the keys set here after the test.
     """
-    # Mock the dependency functions
-    app.dependency_overrides[get_math_llm] = lambda: mock_llm
-    app.dependency_overrides[get_router_llm] = lambda: mock_llm
-    app.dependency_overrides[get_knowledge_engine] = lambda: mock_knowledge_engine
-    app.dependency_overrides[get_redis_service] = lambda: mock_redis_service
+    for mock in (mock_llm, mock_knowledge_engine, mock_redis_service):
+        mock.reset_mock(return_value=True, side_effect=True)
 
-    yield
+    mock_redis_service.add_message_to_history.return_value = True
+    mock_redis_service.get_history.return_value = []
+    mock_redis_service.get_user_conversations.return_value = []
+
+    _override_dependencies(
+        monkeypatch, mock_llm, mock_knowledge_engine, mock_redis_service
+    )
 
-    # Clean up after test
-    app.dependency_overrides.clear()
+
+@pytest.fixture(autouse=True)
+def clear_route_cache():
+    """Clear cached routing decisions so tests do not affect each other."""
+    reset_route_cache()
+    yield
+    reset_route_cache()
 
 
 @pytest.fixture